@@ -1,50 +1,81 @@
-from app.models.analysis import Analysis
+import orjson
+import asyncio
+from contextlib import aclosing
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Union
+from app.models.analysis import Analysis, jsonb_text
 from app.schemas.llm import SentimentEnum
-from app.core.db import get_async_db as get_db
+from app.core.db import get_async_db as get_db, get_async_session
+from app.core.cache import get_cached_analysis, cache_analysis
+from sqlalchemy.orm import defer
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_, func, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import Select, TextClause, select, or_, func, bindparam, text
 from app.services.nlp_utils import extract_keywords
-from app.services.llm_service import get_llm_service
-from app.core.config import get_settings, setup_logging, get_logger
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from app.services.llm_service import LLMService, MockLLMService, get_llm_service
+from app.core.config import get_settings, get_logger
+from pydantic import BaseModel
+from fastapi.responses import Response, StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 
 from app.schemas.analysis import (
     AnalyzeRequest, 
     AnalysisResponse, 
+    AnalysisListItem,
     SearchResponse
 )
 
-settings = get_settings()
-setup_logging(settings)
 logger = get_logger(__name__)
 
 router = APIRouter(prefix="/analysis", tags=["analysis"])
 
+def _json_response(model: BaseModel, status_code: int = status.HTTP_200_OK) -> Response:
+    """Serialize a response model directly, skipping FastAPI's re-validation pass."""
+    return Response(content=model.model_dump_json(), status_code=status_code, media_type="application/json")
+
+
+def _get_llm_service(http_request: Request) -> Union[LLMService, MockLLMService]:
+    """Return the process-wide LLM service created at startup."""
+    llm_service = getattr(http_request.app.state, "llm_service", None)
+    if llm_service is None:
+        # Lifespan did not run (e.g. a TestClient used without a context manager)
+        llm_service = http_request.app.state.llm_service = get_llm_service()
+    return llm_service
+
+
+async def _get_llm_analysis(llm_service: Union[LLMService, MockLLMService], text: str) -> Dict[str, Any]:
+    """Get the LLM analysis for text, reusing a cached result for similar text."""
+    analysis_result = await get_cached_analysis(text)
+    if analysis_result is None:
+        analysis_result = await llm_service.analyze_text(text)
+        await cache_analysis(text, analysis_result)
+    return analysis_result
+
+
 @router.post("/analyze", response_model=AnalysisResponse, status_code=status.HTTP_201_CREATED)
 async def analyze_text(
     request: AnalyzeRequest,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    llm_service: Union[LLMService, MockLLMService] = Depends(_get_llm_service)
 ):
     """Analyze text using LLM and NLP services."""
     try:
-        # Get LLM service
-        llm_service = get_llm_service()
-        
-        # Perform text analysis
-        analysis_result = await llm_service.analyze_text(request.text)
-        
-        # Extract keywords using NLP utils (limit to 3 most frequent nouns)
-        keywords = extract_keywords(request.text, top_n=3)
+        # Run the LLM analysis alongside keyword extraction (3 most frequent nouns),
+        # keeping the CPU-bound NLP work off the event loop
+        analysis_result, keywords = await asyncio.gather(
+            _get_llm_analysis(llm_service, request.text),
+            asyncio.to_thread(extract_keywords, request.text, 3)
+        )
         
-        # Add keywords to metadata
-        metadata_with_keywords = analysis_result["metadata"].copy()
-        metadata_with_keywords["keywords"] = keywords
+        # Add keywords to metadata (the result is a fresh dict, so mutate it in place)
+        metadata = analysis_result["metadata"]
+        metadata["keywords"] = keywords
         
         # Create analysis record
         analysis = Analysis(
             text=request.text,
             summary=analysis_result["summary"],
-            analysis_metadata=metadata_with_keywords
+            analysis_metadata=metadata
         )
         
         # Save to database
@@ -52,11 +83,8 @@ async def analyze_text(
         await db.commit()
         await db.refresh(analysis)
         
-        # Convert model to dict (metadata already mapped in to_dict())
-        analysis_dict = analysis.to_dict()
-        
-        # Return response
-        return AnalysisResponse(**analysis_dict)
+        # Build the response straight from the ORM row and serialize once
+        return _json_response(AnalysisResponse.model_validate(analysis), status_code=status.HTTP_201_CREATED)
         
     except Exception as e:
         logger.exception("Error analyzing text")
@@ -67,74 +95,179 @@ async def analyze_text(
         )
 
 
+def _keyword_tsquery():
+    """Build the full-text query over the bound keyword (shared by filter and ranking)."""
+    return func.plainto_tsquery('english', bindparam("keyword"))
+
+
+async def _stream_analysis(llm_service: Union[LLMService, MockLLMService], text: str) -> AsyncIterator[bytes]:
+    """Yield NDJSON frames: summary deltas, then the stored analysis (or an error frame)."""
+    # Keyword extraction overlaps with the LLM stream
+    keywords_task = asyncio.create_task(asyncio.to_thread(extract_keywords, text, 3))
+    
+    try:
+        analysis_result = await get_cached_analysis(text)
+        if analysis_result is not None:
+            yield orjson.dumps({"delta": analysis_result["summary"]}) + b"\n"
+        else:
+            # aclosing releases the LLM stream (and its concurrency slot) if the client disconnects
+            async with aclosing(llm_service.stream_analyze_text(text)) as items:
+                async for item in items:
+                    if "delta" in item:
+                        yield orjson.dumps(item) + b"\n"
+                    else:
+                        analysis_result = item
+            await cache_analysis(text, analysis_result)
+        
+        metadata = analysis_result["metadata"]
+        metadata["keywords"] = await keywords_task
+        
+        # The request's session may already be closed while the body streams, so use a dedicated one
+        async with get_async_session() as db:
+            analysis = Analysis(
+                text=text,
+                summary=analysis_result["summary"],
+                analysis_metadata=metadata
+            )
+            db.add(analysis)
+            await db.commit()
+            await db.refresh(analysis)
+        
+        # The client already has the text, so the final frame leaves it out
+        yield AnalysisListItem.model_validate(analysis).model_dump_json().encode() + b"\n"
+        
+    except Exception:
+        logger.exception("Error streaming text analysis")
+        yield orjson.dumps({"error": "Failed to analyze text"}) + b"\n"
+    finally:
+        # Also runs on disconnect (GeneratorExit/CancelledError), which the except above doesn't catch
+        keywords_task.cancel()
+
+
+@router.post("/analyze/stream")
+async def analyze_text_stream(
+    request: AnalyzeRequest,
+    llm_service: Union[LLMService, MockLLMService] = Depends(_get_llm_service)
+):
+    """Analyze text, streaming the summary as it is generated (NDJSON)."""
+    return StreamingResponse(_stream_analysis(llm_service, request.text), media_type="application/x-ndjson")
+
+
+def _search_conditions(has_keyword: bool, has_sentiment: bool) -> List[Any]:
+    """Build search filters with their values left as bound parameters."""
+    conditions = []
+    
+    if has_keyword:
+        conditions.append(
+            or_(
+                # Full-text match over text and summary (GIN-indexed)
+                Analysis.search_vec.op('@@')(_keyword_tsquery()),
+                # Match metadata keywords (lowercase lemmas) via the JSONB GIN index
+                Analysis.analysis_metadata.contains(bindparam("keyword_doc", type_=JSONB))
+            )
+        )
+    
+    if has_sentiment:
+        # Filter by sentiment in the metadata JSON field, using the exact expression of the sentiment index
+        conditions.append(jsonb_text(Analysis.analysis_metadata, "sentiment") == bindparam("sentiment"))
+    
+    return conditions
+
+
+@lru_cache(maxsize=None)
+def _search_query(has_keyword: bool, has_sentiment: bool, include_text: bool, with_total: bool = True) -> Select:
+    """Build the paginated search statement once per filter shape."""
+    order_by = []
+    if has_keyword:
+        order_by.append(func.ts_rank_cd(Analysis.search_vec, _keyword_tsquery()).desc())
+    
+    # Newest first, so pagination is stable
+    order_by.append(Analysis.created_at.desc())
+    
+    columns = [Analysis, func.count().over().label("total")] if with_total else [Analysis]
+    query = (
+        select(*columns)
+        .where(*_search_conditions(has_keyword, has_sentiment))
+        .order_by(*order_by)
+        .offset(bindparam("offset"))
+        .limit(bindparam("limit"))
+    )
+    
+    # Listings skip the (up to 10k char) text column unless asked for it
+    if not include_text:
+        query = query.options(defer(Analysis.text, raiseload=True))
+    
+    return query
+
+
+@lru_cache(maxsize=None)
+def _search_count_query(has_keyword: bool, has_sentiment: bool) -> Select:
+    """Build the total-count statement once per filter shape."""
+    return select(func.count()).select_from(Analysis).where(*_search_conditions(has_keyword, has_sentiment))
+
+
+# Planner row estimate, kept current by autovacuum/ANALYZE (-1 if the table was never analyzed)
+_ESTIMATED_COUNT_QUERY: TextClause = text(
+    "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"
+).bindparams(table_name=Analysis.__tablename__)
+
+
+async def _estimated_total(db: AsyncSession) -> int:
+    """Estimate the unfiltered row count, falling back to an exact count."""
+    estimate = (await db.execute(_ESTIMATED_COUNT_QUERY)).scalar()
+    if estimate is None or estimate < 0:
+        return (await db.execute(_search_count_query(False, False))).scalar() or 0
+    return estimate
+
+
 @router.get("/search", response_model=SearchResponse)
 async def search_analyses(
     keyword: str | None = None,
     sentiment: SentimentEnum | None = None,
     limit: int = Query(default=10, ge=1, le=100, description="Maximum number of results to return"),
     offset: int = Query(default=0, ge=0, description="Number of results to skip"),
+    include_text: bool = Query(default=False, description="Include the original text in each result"),
     db: AsyncSession = Depends(get_db)
 ):
     """Search analyses by keyword or sentiment."""
     try:
-        # Build query
-        query = select(Analysis)
-        
-        # Apply filters
-        if keyword:
-            query = query.where(
-                or_(
-                    Analysis.text.ilike(f"%{keyword}%"),
-                    Analysis.summary.ilike(f"%{keyword}%"),
-                    # Search within metadata keywords
-                    func.cast(Analysis.analysis_metadata['keywords'], String).ilike(f"%{keyword}%")
-                )
-            )
-        
-        if sentiment:
-            # Filter by sentiment in the metadata JSON field using JSON extraction
-            query = query.where(func.json_extract_path_text(Analysis.analysis_metadata, 'sentiment') == sentiment.value)
-        
-        # Get total count (optimized)
-        count_query = select(func.count()).select_from(Analysis)
+        # Filter values are bound into a statement prebuilt for this filter shape
+        params: Dict[str, Any] = {"limit": limit, "offset": offset}
         if keyword:
-            count_query = count_query.where(
-                or_(
-                    Analysis.text.ilike(f"%{keyword}%"),
-                    Analysis.summary.ilike(f"%{keyword}%"),
-                    # Search within metadata keywords
-                    func.cast(Analysis.analysis_metadata['keywords'], String).ilike(f"%{keyword}%")
-                )
-            )
+            params["keyword"] = keyword
+            params["keyword_doc"] = {"keywords": [keyword.lower()]}
         if sentiment:
-            # Filter by sentiment in the metadata JSON field using JSON extraction
-            count_query = count_query.where(func.json_extract_path_text(Analysis.analysis_metadata, 'sentiment') == sentiment.value)
+            params["sentiment"] = sentiment.value
         
-        total_result = await db.execute(count_query)
-        total = total_result.scalar() or 0
+        # Unfiltered browsing can use the planner's estimate instead of counting every row
+        estimate_total = get_settings().DATABASE_ESTIMATE_SEARCH_TOTAL and not keyword and not sentiment
         
-        # Apply pagination
-        query = query.offset(offset).limit(limit)
-        
-        # Execute query
-        result = await db.execute(query)
-        analyses = result.scalars().all()
-        
-        # Convert to response format
-        results = []
-        for analysis in analyses:
-            # Convert model to dict (metadata already mapped in to_dict())
-            analysis_dict = analysis.to_dict()
-            # Keywords are already included from to_dict()
+        if estimate_total:
+            query = _search_query(False, False, include_text, with_total=False)
+            analyses = (await db.execute(query, params)).scalars().all()
+            total = await _estimated_total(db)
+            # Never report fewer rows than the page has already shown
+            if analyses:
+                total = max(total, offset + len(analyses))
+        else:
+            # Fetch the page and the total match count in a single round-trip
+            rows = (await db.execute(_search_query(bool(keyword), bool(sentiment), include_text), params)).all()
+            analyses = [row.Analysis for row in rows]
+            total = rows[0].total if rows else 0
             
-            results.append(AnalysisResponse(**analysis_dict))
+            # A page past the end has no rows to carry the window count
+            if not rows and offset > 0:
+                total = (await db.execute(_search_count_query(bool(keyword), bool(sentiment)), params)).scalar() or 0
         
-        return SearchResponse(
-            results=results,
+        # Validate ORM rows directly (no intermediate dicts); the envelope fields are
+        # already typed by the query parameters, so it is constructed without revalidation
+        item_model = AnalysisResponse if include_text else AnalysisListItem
+        return _json_response(SearchResponse.model_construct(
+            results=[item_model.model_validate(analysis) for analysis in analyses],
             total=total,
             limit=limit,
             offset=offset
-        )
+        ))
         
     except Exception:
         logger.exception("Error searching analyses")
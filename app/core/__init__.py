@@ -1,5 +1,6 @@
 from .config import get_logger, get_settings, setup_logging
 from .db import Base, get_async_db, init_db, close_db
+from .cache import get_cached_analysis, cache_analysis, close_cache
 
 __all__ = [
     "get_settings", 
@@ -8,5 +9,8 @@ __all__ = [
     "Base", 
     "get_async_db", 
     "init_db", 
-    "close_db"
+    "close_db",
+    "get_cached_analysis",
+    "cache_analysis",
+    "close_cache"
 ]
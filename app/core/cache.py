@@ -0,0 +1,116 @@
+import time
+import orjson
+import asyncio
+from typing import Any, Dict, Optional
+from redisvl.query.filter import Tag
+from redisvl.utils.vectorize import OpenAITextVectorizer
+from redisvl.extensions.cache.llm import SemanticCache
+from app.core.config import get_settings, get_logger
+
+logger = get_logger(__name__)
+
+# Global variables for the semantic cache
+_semantic_cache = None
+_semantic_cache_disabled = False
+# A failed init (e.g. Redis down at startup) is retried with exponential backoff
+_SEMANTIC_CACHE_RETRY_MIN_SECONDS = 5.0
+_SEMANTIC_CACHE_RETRY_MAX_SECONDS = 300.0
+_semantic_cache_retry_at = 0.0
+_semantic_cache_backoff = _SEMANTIC_CACHE_RETRY_MIN_SECONDS
+
+
+def _build_semantic_cache(settings: Any) -> SemanticCache:
+    """Construct the semantic cache; blocking, as it connects to Redis and sets up the index."""
+    return SemanticCache(
+        name=settings.SEMANTIC_CACHE_NAME,
+        redis_url=settings.REDIS_URL,
+        distance_threshold=settings.SEMANTIC_CACHE_DISTANCE_THRESHOLD,
+        ttl=settings.SEMANTIC_CACHE_TTL_SECONDS,
+        # Half-precision vectors halve index memory with negligible recall loss at this threshold
+        vectorizer=OpenAITextVectorizer(
+            model=settings.SEMANTIC_CACHE_EMBEDDING_MODEL,
+            api_config={"api_key": settings.OPENAI_API_KEY},
+            dtype=settings.SEMANTIC_CACHE_VECTOR_DTYPE,
+        ),
+        filterable_fields=[{"name": "model", "type": "tag"}],
+    )
+
+
+async def _get_semantic_cache() -> Optional[SemanticCache]:
+    """Get or create the semantic cache, or None when caching is unavailable."""
+    global _semantic_cache, _semantic_cache_disabled, _semantic_cache_retry_at, _semantic_cache_backoff
+
+    if _semantic_cache is not None or _semantic_cache_disabled:
+        return _semantic_cache
+
+    settings = get_settings()
+
+    # Embeddings come from OpenAI, so the cache needs both Redis and an API key
+    if not settings.REDIS_URL or not settings.OPENAI_API_KEY:
+        _semantic_cache_disabled = True
+        return None
+
+    now = time.monotonic()
+    if now < _semantic_cache_retry_at:
+        return None
+
+    # Claim the attempt up front so concurrent requests skip the cache instead of building it again
+    _semantic_cache_retry_at = now + _semantic_cache_backoff
+    try:
+        # Building connects to Redis, so keep it off the event loop
+        _semantic_cache = await asyncio.to_thread(_build_semantic_cache, settings)
+    except Exception as e:
+        logger.warning(f"Semantic cache unavailable, retrying in {_semantic_cache_backoff:.0f}s: {e}")
+        _semantic_cache_retry_at = time.monotonic() + _semantic_cache_backoff
+        _semantic_cache_backoff = min(_semantic_cache_backoff * 2, _SEMANTIC_CACHE_RETRY_MAX_SECONDS)
+        return None
+
+    _semantic_cache_backoff = _SEMANTIC_CACHE_RETRY_MIN_SECONDS
+    return _semantic_cache
+
+
+async def get_cached_analysis(text: str) -> Optional[Dict[str, Any]]:
+    """Return a cached LLM analysis for semantically similar text, if any."""
+    cache = await _get_semantic_cache()
+    if cache is None:
+        return None
+
+    try:
+        # Scope hits to the current model so a model bump invalidates old entries
+        hits = await cache.acheck(
+            prompt=text,
+            num_results=1,
+            filter_expression=Tag("model") == get_settings().OPENAI_MODEL,
+        )
+    except Exception as e:
+        logger.warning(f"Semantic cache lookup failed: {e}")
+        return None
+
+    if not hits:
+        return None
+
+    logger.info("Semantic cache hit", extra={"event": "semantic_cache_hit"})
+    return orjson.loads(hits[0]["response"])
+
+
+async def cache_analysis(text: str, analysis_result: Dict[str, Any]) -> None:
+    """Store an LLM analysis so similar text can reuse it."""
+    cache = await _get_semantic_cache()
+    if cache is None:
+        return
+
+    try:
+        await cache.astore(
+            prompt=text,
+            response=orjson.dumps(analysis_result).decode(),
+            filters={"model": get_settings().OPENAI_MODEL},
+        )
+    except Exception as e:
+        logger.warning(f"Semantic cache store failed: {e}")
+
+
+async def close_cache():
+    """Close semantic cache connections."""
+    if _semantic_cache:
+        await _semantic_cache.adisconnect()
+        logger.info("Semantic cache connections closed")
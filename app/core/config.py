@@ -34,6 +34,9 @@ class DatabaseSettings(BaseSettings):
     DATABASE_URL: PostgresDsn | None = None
     DATABASE_POOL_SIZE: int = 10
     DATABASE_MAX_OVERFLOW: int = 20
+    DATABASE_STATEMENT_CACHE_SIZE: int = 512  # Prepared statements kept per connection; 0 behind pgbouncer
+    DATABASE_QUERY_CACHE_SIZE: int = 1200  # Compiled SQL statements kept per engine
+    DATABASE_ESTIMATE_SEARCH_TOTAL: bool = False  # Use the planner's row estimate for unfiltered search totals
 
     @field_validator('DATABASE_URL', mode='before')
     def assemble_db_url(cls, v: str | None, info: ValidationInfo) -> str | None:
@@ -65,6 +68,24 @@ class OpenAISettings(BaseSettings):
     OPENAI_MODEL: str = Field(default='gpt-3.5-turbo')
     OPENAI_MAX_TOKENS: int = Field(default=1000)
     OPENAI_TEMPERATURE: float = Field(default=0.7)
+    OPENAI_MAX_RETRIES: int = Field(default=3)
+    OPENAI_TIMEOUT_SECONDS: float = Field(default=30.0)
+    OPENAI_CONNECT_TIMEOUT_SECONDS: float = Field(default=5.0)
+    OPENAI_MAX_CONCURRENCY: int = Field(default=8)  # In-flight API calls per process
+    OPENAI_STREAM_JSON: bool = Field(default=True)  # Stream JSON completions and stop at the closing brace
+    ANALYZE_BATCHED: bool = Field(default=True)  # One completion for summary + metadata; False uses two calls
+
+
+class CacheSettings(BaseSettings):
+    """LLM response cache configuration."""
+    REDIS_URL: Optional[str] = None
+    SEMANTIC_CACHE_NAME: str = Field(default='analysis')
+    SEMANTIC_CACHE_DISTANCE_THRESHOLD: float = Field(default=0.1)
+    SEMANTIC_CACHE_TTL_SECONDS: Optional[int] = Field(default=86400)
+    SEMANTIC_CACHE_EMBEDDING_MODEL: str = Field(default='text-embedding-3-small')
+    SEMANTIC_CACHE_VECTOR_DTYPE: str = Field(default='float16')  # Stored embedding precision; changing it needs a new cache name
+    LLM_CACHE_TTL_SECONDS: int = Field(default=3600)  # Exact-match completion cache; 0 disables it
+    LLM_CACHE_MAX_ENTRIES: int = Field(default=1024)  # In-process entries when REDIS_URL is unset
 
 
 class LoggingSettings(BaseSettings):
@@ -84,6 +105,7 @@ class Settings(
     DatabaseSettings,
     AppSettings,
     OpenAISettings,
+    CacheSettings,
     LoggingSettings,
 ):
     """Main settings class that combines all configuration sections."""
@@ -102,8 +124,16 @@ def get_settings() -> Settings:
     return Settings()
 
 
+_logging_configured = False
+
+
 def setup_logging(settings: Settings) -> None:
-    """Setup logging configuration for the entire application."""
+    """Setup logging configuration for the entire application (once per process)."""
+    global _logging_configured
+    
+    if _logging_configured:
+        return
+    
     # Create formatter
     formatter = ColoredFormatter(
         settings.LOG_FORMAT,
@@ -121,7 +151,8 @@ def setup_logging(settings: Settings) -> None:
         level=getattr(logging, settings.LOG_LEVEL.upper()),
         handlers=[handler],
         force=True  # Override any existing configuration
-    )    
+    )
+    _logging_configured = True
 
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance with the configured formatting."""
@@ -1,10 +1,8 @@
 from typing import AsyncGenerator
 from sqlalchemy.orm import declarative_base
-from app.core import get_settings, setup_logging, get_logger
+from app.core import get_settings, get_logger
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 
-settings = get_settings()
-setup_logging(settings)
 logger = get_logger(__name__)
 
 # Create base class for models
@@ -20,12 +18,20 @@ def _get_async_engine():
     global _async_engine
     
     if _async_engine is None:
+        settings = get_settings()
         _async_engine = create_async_engine(
             str(settings.DATABASE_URL),
             pool_pre_ping=True,
             pool_recycle=300,
             pool_size=settings.DATABASE_POOL_SIZE,
             max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_use_lifo=True,  # Reuse the most recently returned (warm) connection
+            query_cache_size=settings.DATABASE_QUERY_CACHE_SIZE,
+            connect_args={
+                # Reuse server-side prepared statements instead of re-preparing each query
+                "prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+                "statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+            },
         )
     
     return _async_engine
@@ -58,8 +64,14 @@ async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+def get_async_session() -> AsyncSession:
+    """Create a standalone session for work outside a request dependency (e.g. streaming responses)."""
+    return _get_async_session_factory()()
+
+
 async def init_db():
-    """Initialize database tables."""
+    """Initialize database tables and their indexes in one transaction."""
+    # A single create_all over run_sync; checkfirst skips tables that already exist
     async with _get_async_engine().begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
@@ -1,21 +1,26 @@
+import asyncio
 import uvicorn
 from fastapi import FastAPI
 from fastapi.responses import Response
 from app.core.db import close_db, init_db
+from app.core.cache import close_cache
+from app.services.llm_service import get_llm_service
+from app.services.nlp_utils import warm_up as warm_up_nlp
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 from app.schemas import HomeResponse, HealthResponse
 from app.api.routes import router as analysis_router
 from app.core import get_settings, setup_logging, get_logger
 
-# Get settings and setup logging
+# Get settings (logging is configured once, when the app starts)
 settings = get_settings()
-setup_logging(settings)
 logger = get_logger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Handle application lifespan events."""    
+    """Handle application lifespan events."""
+    setup_logging(settings)
+    
     try:
         logger.info("Initializing database connection...")
         await init_db()
@@ -23,7 +28,18 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
     
+    # Load NLTK models once per worker, off the event loop
+    try:
+        await asyncio.to_thread(warm_up_nlp)
+    except Exception as e:
+        logger.warning(f"NLP warm-up failed, models will load on first use: {e}")
+    
+    # One LLM service (and HTTP client) per process, shared by all requests
+    app.state.llm_service = get_llm_service()
+    
     yield
+    await app.state.llm_service.aclose()
+    await close_cache()
     await close_db()
 
 app = FastAPI(
@@ -74,6 +90,7 @@ async def health_check():
     }
 
 if __name__ == "__main__":
+    setup_logging(settings)
     logger.info(f"Starting server on {settings.APP_HOST}:{settings.APP_PORT}")
     uvicorn.run(
         app, 
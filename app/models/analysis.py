@@ -2,7 +2,18 @@
 from app.core.db import Base
 from typing import Dict, Any
 from sqlalchemy.sql import func
-from sqlalchemy import Column, Integer, Text, DateTime, JSON
+from sqlalchemy.orm import deferred
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy import Column, Integer, Text, DateTime, Index, Computed, ColumnElement, literal_column
+
+
+def jsonb_text(column: Any, key: str) -> ColumnElement:
+    """Render `column ->> 'key'` with the key as a literal, as expression indexes need.
+    
+    A bound key would be a parameter in prepared statements, and generic plans
+    could then no longer match the indexed expression.
+    """
+    return column.op('->>', return_type=Text)(literal_column(f"'{key}'"))
 
 
 class Analysis(Base):
@@ -13,9 +24,27 @@ class Analysis(Base):
     id = Column(Integer, primary_key=True, index=True)
     text = Column(Text, nullable=False, comment="Original input text")
     summary = Column(Text, nullable=True, comment="LLM-generated summary")
-    analysis_metadata = Column(JSON, nullable=True, comment="Additional analysis metadata")
+    analysis_metadata = Column(JSONB, nullable=True, comment="Additional analysis metadata")
 
     created_at = Column(DateTime(timezone=True), server_default=func.now(), comment="Creation timestamp")
+
+    # Full-text search vector maintained by Postgres; deferred so listings never fetch it
+    search_vec = deferred(Column(
+        TSVECTOR,
+        Computed("to_tsvector('english', coalesce(text, '') || ' ' || coalesce(summary, ''))", persisted=True),
+        comment="Full-text search vector over text and summary"
+    ))
+
+    __table_args__ = (
+        Index("ix_analyses_search_vec", "search_vec", postgresql_using="gin"),
+        # Serves containment (@>) lookups such as keyword matches
+        Index(
+            "ix_analyses_metadata_gin", "analysis_metadata",
+            postgresql_using="gin", postgresql_ops={"analysis_metadata": "jsonb_path_ops"}
+        ),
+        # Serves sentiment filtering with newest-first pagination
+        Index("ix_analyses_sentiment_created", jsonb_text(analysis_metadata, "sentiment"), created_at),
+    )
     
     def __repr__(self):
         return f"<Analysis(id={self.id})>"
@@ -1,6 +1,6 @@
 from .llm import Metadata
 from .responses import HomeResponse, HealthResponse
-from .analysis import AnalyzeRequest, AnalysisResponse, SearchResponse
+from .analysis import AnalyzeRequest, AnalysisResponse, AnalysisListItem, SearchResponse
 
 __all__ = [
     "HomeResponse",
@@ -8,5 +8,6 @@ __all__ = [
     "Metadata",
     "AnalyzeRequest",
     "AnalysisResponse", 
+    "AnalysisListItem",
     "SearchResponse"
 ]
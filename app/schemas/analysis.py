@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import List, Dict, Any
-from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Union
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 
 class AnalyzeRequest(BaseModel):
     """Request schema for text analysis."""
@@ -12,13 +12,26 @@ class AnalysisResponse(BaseModel):
     id: int
     text: str
     summary: str
-    metadata: Dict[str, Any]
+    # ORM rows expose this as analysis_metadata (Base.metadata is SQLAlchemy's MetaData)
+    metadata: Dict[str, Any] = Field(validation_alias=AliasChoices("analysis_metadata", "metadata"))
     created_at: datetime
 
+    model_config = ConfigDict(from_attributes=True)
+
+
+class AnalysisListItem(BaseModel):
+    """Search result schema without the original text."""
+    id: int
+    summary: str
+    metadata: Dict[str, Any] = Field(validation_alias=AliasChoices("analysis_metadata", "metadata"))
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
 
 class SearchResponse(BaseModel):
     """Response schema for search results."""
-    results: List[AnalysisResponse]
+    results: List[Union[AnalysisResponse, AnalysisListItem]]
     total: int
     limit: int
     offset: int
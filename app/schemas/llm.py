@@ -31,3 +31,11 @@ class Metadata(BaseModel):
                 v.append("content")
         
         return v[:3]  # Truncate if more than 3
+
+    @field_validator("sentiment", mode="before")
+    @classmethod
+    def coerce_sentiment(cls, v):
+        """Normalize case and map unknown sentiments to neutral instead of rejecting the metadata."""
+        if isinstance(v, str) and v.strip().lower() in SentimentEnum.__members__:
+            return v.strip().lower()
+        return SentimentEnum.neutral
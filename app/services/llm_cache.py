@@ -0,0 +1,118 @@
+import time
+import orjson
+import hashlib
+from collections import OrderedDict
+from redis import asyncio as aioredis
+from typing import Any, Optional, Protocol, Tuple
+from app.core.config import Settings, get_logger
+
+logger = get_logger(__name__)
+
+
+class CacheBackend(Protocol):
+    """Storage interface for cached LLM completions."""
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached value, or None on a miss."""
+        ...
+
+    async def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        """Store a value that expires after ttl_seconds."""
+        ...
+
+    async def aclose(self) -> None:
+        """Release backend resources."""
+        ...
+
+
+class MemoryBackend:
+    """Bounded in-process backend with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl_seconds, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def aclose(self) -> None:
+        self._entries.clear()
+
+
+class RedisBackend:
+    """Redis backend, shared across workers."""
+
+    def __init__(self, redis_url: str):
+        self._client = aioredis.from_url(redis_url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        await self._client.set(key, value, ex=ttl_seconds)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class LLMCache:
+    """Exact-match cache for chat completions; backend errors are treated as misses."""
+
+    def __init__(self, backend: CacheBackend, ttl_seconds: int = 3600, namespace: str = "llm:completion:"):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+
+    def make_key(self, **request: Any) -> str:
+        """Hash the request parameters that determine the completion."""
+        payload = orjson.dumps(request, option=orjson.OPT_SORT_KEYS)
+        return self.namespace + hashlib.sha256(payload).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """Return a cached completion, or None on a miss or backend error."""
+        try:
+            return await self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed: {e}")
+            return None
+
+    async def set(self, key: str, value: str) -> None:
+        """Store a completion, ignoring backend errors."""
+        try:
+            await self.backend.set(key, value, self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"LLM cache store failed: {e}")
+
+    async def aclose(self) -> None:
+        """Close the backend."""
+        await self.backend.aclose()
+
+
+def create_llm_cache(settings: Settings) -> Optional[LLMCache]:
+    """Create the completion cache configured in settings, or None when disabled."""
+    if settings.LLM_CACHE_TTL_SECONDS <= 0:
+        return None
+
+    # Redis lets workers share entries; otherwise each process keeps its own
+    if settings.REDIS_URL:
+        backend: CacheBackend = RedisBackend(settings.REDIS_URL)
+    else:
+        backend = MemoryBackend(max_entries=settings.LLM_CACHE_MAX_ENTRIES)
+
+    return LLMCache(backend, ttl_seconds=settings.LLM_CACHE_TTL_SECONDS)
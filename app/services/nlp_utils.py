@@ -1,11 +1,79 @@
 import re
-from nltk.tag import pos_tag
+import hashlib
+from threading import Lock
+from nltk.tag import PerceptronTagger
 from functools import lru_cache
-from collections import Counter
+from collections import Counter, OrderedDict
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
-from typing import List, Tuple, Set, Dict, Union
-from nltk.tokenize import word_tokenize, sent_tokenize
+from typing import Any, Iterator, List, Tuple, Set, Dict, Union
+
+# Applied after lowercasing, so only the lowercase range needs keeping
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9\s]+')
+# A sentence runs to terminal punctuation followed by whitespace (so "3.14" doesn't split), or to the end
+_SENTENCE_RE = re.compile(r'\S.*?(?:[.!?]+(?=\s|\Z)|\Z)', re.DOTALL)
+
+_LEMMATIZER = WordNetLemmatizer()
+
+
+class _DigestLRU:
+    """Thread-safe LRU for results of the default processor, keyed by a text digest."""
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[Any, ...], Any]" = OrderedDict()
+        # Lock because the API runs extraction in worker threads
+        self._lock = Lock()
+    
+    @staticmethod
+    def make_key(text: str, *params: Any) -> Tuple[Any, ...]:
+        """Key on a BLAKE2b digest so large texts are not held as keys."""
+        return (hashlib.blake2b(text.encode(), digest_size=16).digest(), *params)
+    
+    def get(self, key: Tuple[Any, ...]) -> Any:
+        """Return the cached value, or None on a miss."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+    
+    def put(self, key: Tuple[Any, ...], value: Any) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Values are stored as tuples so callers always get fresh, independent lists
+_keyword_cache = _DigestLRU(maxsize=4096)
+_stats_cache = _DigestLRU(maxsize=1024)
+
+
+@lru_cache(maxsize=100_000)
+def _lemmatize(word: str) -> str:
+    """Lemmatize a word as a noun; word frequencies are Zipfian, so most lookups hit the cache."""
+    return _LEMMATIZER.lemmatize(word)
+
+
+@lru_cache(maxsize=1)
+def _get_default_stop_words() -> frozenset[str]:
+    """Lemmatize the English stopword list once per process (lazily, so importing needs no NLTK data)."""
+    return frozenset(_lemmatize(w) for w in stopwords.words('english'))
+
+
+@lru_cache(maxsize=1)
+def _get_tagger() -> PerceptronTagger:
+    """Load the perceptron POS tagger once; pos_tag may rebuild it per call on older NLTK releases."""
+    return PerceptronTagger()
+
 
 @lru_cache(maxsize=1)
 def _get_default_processor() -> 'NLPProcessor':
@@ -18,9 +86,11 @@ class NLPProcessor:
     
     def __init__(self, stop_words: Set[str] | None = None, min_word_length: int = 2):
         # Normalize stopwords by lemmatizing them to match processed nouns
-        raw_stop_words = stop_words or set(stopwords.words('english'))
-        self.lemmatizer = WordNetLemmatizer()
-        self.stop_words = {self.lemmatizer.lemmatize(w) for w in raw_stop_words}
+        self.lemmatizer = _LEMMATIZER
+        if stop_words:
+            self.stop_words = frozenset(_lemmatize(w) for w in stop_words)
+        else:
+            self.stop_words = _get_default_stop_words()
         self.min_word_length = min_word_length
     
     def clean_text(self, text: str) -> str:
@@ -29,42 +99,71 @@ class NLPProcessor:
             return ""
         
         # Convert to lowercase and remove special characters but keep spaces
-        text = text.lower()
-        text = re.sub(r'[^a-zA-Z0-9\s]', ' ', text)
-        # Remove extra whitespace
-        return re.sub(r'\s+', ' ', text).strip()
+        text = _NON_ALNUM_RE.sub(' ', text.lower())
+        # Collapse whitespace (str.split is much faster than a \s+ substitution)
+        return ' '.join(text.split())
+    
+    def _tokenize(self, text: str) -> List[str]:
+        """Split cleaned text into words."""
+        # clean_text leaves only single-space-separated [a-z0-9] runs, so a plain split suffices
+        return self.clean_text(text).split()
     
     def extract_nouns(self, text: str) -> List[str]:
         """Extract nouns from text using POS tagging."""
         if not text or not text.strip():
             return []
         
+        # The whole text is tagged as one token sequence, so a single tagger call covers every sentence
+        return self.extract_nouns_batch([text])[0]
+    
+    def extract_nouns_batch(self, texts: List[str]) -> List[List[str]]:
+        """Extract nouns from many texts, POS-tagging them all in one pass."""
+        return [self._nouns_from_tags(pos_tags) for pos_tags in self._tagged(texts)]
+    
+    def _tagged(self, texts: List[str]) -> List[List[Tuple[str, str]]]:
+        """Tokenize each text and POS-tag them all with a single tagger call."""
         # Use clean_text for consistent tokenization across all methods
-        tokens = word_tokenize(self.clean_text(text))
-        pos_tags = pos_tag(tokens)
-        
-        return [
-            self.lemmatizer.lemmatize(word)
-            for word, tag in pos_tags
+        token_lists = [self._tokenize(text) for text in texts]
+        return _get_tagger().tag_sents(token_lists)
+    
+    def _iter_nouns(self, pos_tags: List[Tuple[str, str]]) -> Iterator[str]:
+        """Yield lemmatized nouns from POS-tagged tokens."""
+        stop_words = self.stop_words
+        for word, tag in pos_tags:
             if (tag.startswith('NN') and 
                 len(word) > self.min_word_length and 
-                word not in self.stop_words)
-        ]
+                word not in stop_words):
+                yield _lemmatize(word)
+    
+    def _nouns_from_tags(self, pos_tags: List[Tuple[str, str]]) -> List[str]:
+        """Keep lemmatized nouns from POS-tagged tokens."""
+        return list(self._iter_nouns(pos_tags))
     
     def get_keyword_frequency(self, text: str, top_n: int = 3) -> List[Tuple[str, int]]:
         """Get the most frequent nouns as keywords."""
-        nouns = self.extract_nouns(text)
-        return Counter(nouns).most_common(top_n) if nouns else []
+        if not text or not text.strip():
+            return []
+        
+        # Count nouns as they are produced rather than collecting them into a list first
+        return Counter(self._iter_nouns(self._tagged([text])[0])).most_common(top_n)
     
     def extract_keywords(self, text: str, top_n: int = 3) -> List[str]:
         """Extract top N keywords from text."""
         return [keyword for keyword, _ in self.get_keyword_frequency(text, top_n)]
     
+    def extract_keywords_batch(self, texts: List[str], top_n: int = 3) -> List[List[str]]:
+        """Extract top N keywords for each text, POS-tagging all texts in one pass."""
+        return [
+            [keyword for keyword, _ in Counter(self._iter_nouns(pos_tags)).most_common(top_n)]
+            for pos_tags in self._tagged(texts)
+        ]
+    
     def get_sentence_count(self, text: str) -> int:
         """Get the number of sentences in the text."""
         if not text or not text.strip():
             return 0
-        return len(sent_tokenize(text))
+        # A regex split is far cheaper than Punkt and only the count is needed
+        return sum(1 for _ in _SENTENCE_RE.finditer(text))
     
     def get_word_count(self, text: str) -> int:
         """Get the number of words in the text."""
@@ -72,14 +171,46 @@ class NLPProcessor:
             return 0
         
         # Use clean_text for consistent tokenization
-        words = word_tokenize(self.clean_text(text))
-        return len([word for word in words if word not in self.stop_words])
+        stop_words = self.stop_words
+        return sum(1 for word in self._tokenize(text) if word not in stop_words)
+    
+    def _analyze(self, text: str) -> Dict[str, Any]:
+        """Clean, tokenize and tag the text once for all derived statistics."""
+        tokens = self._tokenize(text)
+        return {
+            "clean_tokens": [token for token in tokens if token not in self.stop_words],
+            "nouns": self._nouns_from_tags(_get_tagger().tag(tokens)) if tokens else [],
+            "sentence_count": self.get_sentence_count(text)
+        }
 
 
 # Convenience functions using the cached default processor
 def extract_keywords(text: str, top_n: int = 3) -> List[str]:
-    """Extract top N keywords from text using default NLP processor."""
-    return _get_default_processor().extract_keywords(text, top_n)
+    """Extract top N keywords from text using default NLP processor, caching results by text hash."""
+    key = _keyword_cache.make_key(text, top_n)
+    cached = _keyword_cache.get(key)
+    if cached is not None:
+        return list(cached)
+    
+    keywords = _get_default_processor().extract_keywords(text, top_n)
+    _keyword_cache.put(key, tuple(keywords))
+    return keywords
+
+
+def extract_keywords_batch(texts: List[str], top_n: int = 3) -> List[List[str]]:
+    """Extract top N keywords for many texts, tagging only cache misses in a single batch."""
+    keys = [_keyword_cache.make_key(text, top_n) for text in texts]
+    cached = [_keyword_cache.get(key) for key in keys]
+    results = [list(keywords) if keywords is not None else None for keywords in cached]
+    misses = [i for i, keywords in enumerate(results) if keywords is None]
+    
+    if misses:
+        batch = _get_default_processor().extract_keywords_batch([texts[i] for i in misses], top_n)
+        for i, keywords in zip(misses, batch):
+            _keyword_cache.put(keys[i], tuple(keywords))
+            results[i] = list(keywords)
+    
+    return results
 
 
 def get_text_stats(text: str, top_n: int = 3) -> Dict[str, Union[int, List[str], List[Tuple[str, int]]]]:
@@ -92,15 +223,30 @@ def get_text_stats(text: str, top_n: int = 3) -> Dict[str, Union[int, List[str],
             'keyword_frequency': []
         }
     
-    processor = _get_default_processor()
+    key = _stats_cache.make_key(text, top_n)
+    cached = _stats_cache.get(key)
+    if cached is None:
+        # One pass over the text; every statistic is derived from it
+        analysis = _get_default_processor()._analyze(text)
+        keyword_frequency = tuple(Counter(analysis['nouns']).most_common(top_n))
+        cached = (len(analysis['clean_tokens']), analysis['sentence_count'], keyword_frequency)
+        _stats_cache.put(key, cached)
+    
+    word_count, sentence_count, keyword_frequency = cached
     return {
-        'word_count': processor.get_word_count(text),
-        'sentence_count': processor.get_sentence_count(text),
-        'keywords': processor.extract_keywords(text, top_n),
-        'keyword_frequency': processor.get_keyword_frequency(text, top_n)
+        'word_count': word_count,
+        'sentence_count': sentence_count,
+        'keywords': [keyword for keyword, _ in keyword_frequency],
+        'keyword_frequency': list(keyword_frequency)
     }
 
 
+def warm_up() -> None:
+    """Load the stopwords, WordNet and tagger models so the first request doesn't pay for it."""
+    processor = _get_default_processor()
+    processor.extract_keywords("Warming up the tagger and lemmatizer for incoming requests.")
+
+
 def create_processor(stop_words: Set[str] | None = None, min_word_length: int = 2) -> NLPProcessor:
     """Create a custom NLPProcessor instance with specific configuration."""
     return NLPProcessor(stop_words=stop_words, min_word_length=min_word_length)
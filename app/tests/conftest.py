@@ -0,0 +1,133 @@
+import json
+import httpx
+import pytest
+import pytest_asyncio
+from contextlib import ExitStack
+from fastapi.testclient import TestClient
+from typing import Any, Callable, Dict, List, Optional, Union
+from unittest.mock import patch
+from openai import AsyncOpenAI
+
+from app.main import app
+from app.services.nlp_utils import NLPProcessor
+from app.services.llm_cache import LLMCache
+from app.services.llm_service import LLMService, MockLLMService
+
+
+@pytest.fixture(scope="module")
+def client():
+    """Create one test client per test module (tests must not mutate app state)."""
+    return TestClient(app)
+
+
+@pytest.fixture(scope="session")
+def processor():
+    """Share one NLPProcessor across the run; it holds no state that tests mutate."""
+    return NLPProcessor()
+
+
+@pytest.fixture(scope="session")
+def mock_service():
+    """Share one stateless MockLLMService across the run."""
+    return MockLLMService()
+
+
+# A reply is the message content, a list of streamed deltas, or a raw HTTP response
+Reply = Union[str, List[str], httpx.Response]
+
+
+class FakeOpenAIAPI:
+    """Serve chat completions to a real AsyncOpenAI client through httpx.MockTransport."""
+    
+    def __init__(self):
+        self.requests: List[Dict[str, Any]] = []
+        self.streamed: List[str] = []
+        self.content: Reply = "Test response"
+        self.handler: Optional[Callable[[Dict[str, Any]], Reply]] = None
+    
+    def reset(self) -> None:
+        """Forget recorded requests and restore the default reply."""
+        self.requests.clear()
+        self.streamed.clear()
+        self.content = "Test response"
+        self.handler = None
+    
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.requests.append(body)
+        reply = self.handler(body) if self.handler else self.content
+        
+        if isinstance(reply, httpx.Response):
+            return reply
+        if body.get("stream"):
+            deltas = reply if isinstance(reply, list) else [reply]
+            return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=self._events(deltas))
+        return httpx.Response(200, json={
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}]
+        })
+    
+    async def _events(self, deltas: List[str]):
+        """Yield one server-sent event per delta, recording how far the client read."""
+        for delta in deltas:
+            self.streamed.append(delta)
+            chunk = {
+                "id": "chatcmpl-test",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": "gpt-3.5-turbo",
+                "choices": [{"index": 0, "delta": {"content": delta}, "finish_reason": None}]
+            }
+            yield f"data: {json.dumps(chunk)}\n\n".encode()
+        yield b"data: [DONE]\n\n"
+
+
+@pytest.fixture(scope="session")
+def shared_openai_api():
+    """One fake OpenAI API for the run; reset per test by openai_api."""
+    return FakeOpenAIAPI()
+
+
+@pytest.fixture(scope="session")
+def llm_service_factory(shared_openai_api):
+    """Build LLMService instances whose OpenAI client talks to the fake API.
+    
+    Callers own the services they build and close them with aclose().
+    """
+    def create_service(cache: Optional[LLMCache] = None) -> LLMService:
+        def create_client(**kwargs) -> AsyncOpenAI:
+            http_client = httpx.AsyncClient(transport=httpx.MockTransport(shared_openai_api))
+            return AsyncOpenAI(http_client=http_client, **kwargs)
+        
+        with ExitStack() as stack:
+            stack.enter_context(patch('app.services.llm_service.AsyncOpenAI', create_client))
+            mock_settings = stack.enter_context(patch('app.services.llm_service.get_settings')).return_value
+            mock_settings.OPENAI_API_KEY = "test_key"
+            mock_settings.OPENAI_MODEL = "gpt-3.5-turbo"
+            mock_settings.OPENAI_MAX_RETRIES = 0
+            mock_settings.OPENAI_TIMEOUT_SECONDS = 5.0
+            mock_settings.OPENAI_CONNECT_TIMEOUT_SECONDS = 1.0
+            mock_settings.OPENAI_MAX_CONCURRENCY = 4
+            mock_settings.ANALYZE_BATCHED = False
+            mock_settings.OPENAI_STREAM_JSON = False
+            return LLMService(cache=cache)
+    
+    return create_service
+
+
+@pytest.fixture
+def openai_api(shared_openai_api):
+    """Return the shared fake API with recorded requests and replies reset."""
+    shared_openai_api.reset()
+    return shared_openai_api
+
+
+@pytest_asyncio.fixture
+async def llm_service(llm_service_factory, openai_api):
+    """Build a fresh LLMService per test, bound to a freshly reset fake API, and close it afterwards."""
+    service = llm_service_factory()
+    yield service
+    await service.aclose()
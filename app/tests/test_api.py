@@ -1,9 +1,17 @@
+import json
+import time
 import pytest
+import asyncio
+from datetime import datetime, timezone
 from unittest.mock import AsyncMock, patch, MagicMock
-from fastapi.testclient import TestClient
+from pydantic import ValidationError
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.schema import CreateIndex
 
 from app.main import app
+from app.api.routes import _estimated_total, _get_llm_service, _search_query, _stream_analysis
+from app.services.llm_service import MockLLMService
 from app.models.analysis import Analysis
 from app.schemas.analysis import AnalyzeRequest
 
@@ -11,44 +19,123 @@ from app.schemas.analysis import AnalyzeRequest
 class TestAnalyzeEndpoint:
     """Test cases for the /analyze endpoint."""
     
-    @pytest.fixture
-    def client(self):
-        """Create test client."""
-        return TestClient(app)
-    
-    def test_analyze_text_empty_text(self, client):
+    def test_analyze_text_empty_text(self):
         """Test analysis with empty text."""
-        response = client.post(
-            "/analysis/analyze",
-            json={"text": ""}
-        )
-        assert response.status_code == 422  # Validation error
+        with pytest.raises(ValidationError):
+            AnalyzeRequest(text="")
     
-    def test_analyze_text_missing_text(self, client):
+    def test_analyze_text_missing_text(self):
         """Test analysis with missing text field."""
-        response = client.post(
-            "/analysis/analyze",
-            json={}
-        )
-        assert response.status_code == 422  # Validation error
+        with pytest.raises(ValidationError):
+            AnalyzeRequest()
     
-    def test_analyze_text_too_long(self, client):
+    def test_analyze_text_too_long(self):
         """Test analysis with text exceeding max length."""
         long_text = "x" * 10001  # Exceeds max_length=10000
+        with pytest.raises(ValidationError):
+            AnalyzeRequest(text=long_text)
+    
+    def test_analyze_text_validation_error_response(self, client):
+        """Test that invalid payloads are rejected by the endpoint."""
         response = client.post(
             "/analysis/analyze",
-            json={"text": long_text}
+            json={"text": ""}
         )
         assert response.status_code == 422  # Validation error
 
 
-class TestSearchEndpoint:
-    """Test cases for the /search endpoint."""
+class _FakeSession:
+    """Async session stand-in that assigns database defaults on refresh."""
+    
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.added = []
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+    
+    def add(self, analysis):
+        self.added.append(analysis)
+    
+    async def commit(self):
+        if self.fail:
+            raise RuntimeError("database unavailable")
+    
+    async def refresh(self, analysis):
+        analysis.id = 1
+        analysis.created_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+class TestAnalyzeStreamEndpoint:
+    """Test cases for the /analyze/stream endpoint."""
     
     @pytest.fixture
-    def client(self):
-        """Create test client."""
-        return TestClient(app)
+    def stream_client(self, client):
+        """Serve the endpoint with the mock LLM service and stubbed cache, keywords and database."""
+        app.dependency_overrides[_get_llm_service] = MockLLMService
+        with patch('app.api.routes.get_cached_analysis', AsyncMock(return_value=None)), \
+                patch('app.api.routes.cache_analysis', AsyncMock()), \
+                patch('app.api.routes.extract_keywords', return_value=["keyword"]):
+            yield client
+        app.dependency_overrides.pop(_get_llm_service)
+    
+    def test_stream_frames(self, stream_client):
+        """Test that summary deltas are followed by the stored record without its text."""
+        session = _FakeSession()
+        with patch('app.api.routes.get_async_session', return_value=session):
+            response = stream_client.post("/analysis/analyze/stream", json={"text": "Streaming endpoint test."})
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        frames = [json.loads(line) for line in response.text.splitlines()]
+        
+        deltas = [frame["delta"] for frame in frames[:-1]]
+        assert "".join(deltas).strip() == MockLLMService()._generate_summary_sync("Streaming endpoint test.")
+        assert frames[-1]["id"] == 1
+        assert frames[-1]["metadata"]["keywords"] == ["keyword"]
+        assert "text" not in frames[-1]
+        assert session.added[0].text == "Streaming endpoint test."
+    
+    def test_stream_error_frame(self, stream_client):
+        """Test that a failure after streaming starts ends with an error frame."""
+        with patch('app.api.routes.get_async_session', return_value=_FakeSession(fail=True)):
+            response = stream_client.post("/analysis/analyze/stream", json={"text": "Streaming endpoint test."})
+        
+        frames = [json.loads(line) for line in response.text.splitlines()]
+        assert frames[-1] == {"error": "Failed to analyze text"}
+        assert all("delta" in frame for frame in frames[:-1])
+    
+    @pytest.mark.asyncio
+    async def test_disconnect_closes_llm_stream(self):
+        """Test that closing the response stream closes the LLM stream and cancels keyword extraction."""
+        closed = asyncio.Event()
+        
+        class StallingService:
+            async def stream_analyze_text(self, text):
+                try:
+                    yield {"delta": "partial"}
+                    await asyncio.Event().wait()
+                finally:
+                    closed.set()
+        
+        with patch('app.api.routes.get_cached_analysis', AsyncMock(return_value=None)), \
+                patch('app.api.routes.extract_keywords', side_effect=lambda *args: time.sleep(0.2) or []):
+            frames = _stream_analysis(StallingService(), "Streaming endpoint test.")
+            assert json.loads(await anext(frames)) == {"delta": "partial"}
+            keyword_tasks = asyncio.all_tasks() - {asyncio.current_task()}
+            await frames.aclose()
+            # Let the cancellation reach the keyword task
+            await asyncio.sleep(0)
+        
+        assert closed.is_set()
+        assert keyword_tasks and all(task.cancelled() for task in keyword_tasks)
+
+
+class TestSearchEndpoint:
+    """Test cases for the /search endpoint."""
     
     def test_search_invalid_limit(self, client):
         """Test search with invalid limit."""
@@ -78,4 +165,39 @@ class TestSearchEndpoint:
             response = client.get(f"/analysis/search?sentiment={sentiment}")
             # Should not return 422 validation error for valid sentiment
             assert response.status_code != 422
+    
+    def test_sentiment_filter_matches_index_expression(self):
+        """Test that the sentiment filter renders the literal-key expression the index is built on."""
+        dialect = postgresql.asyncpg.dialect()
+        query = str(_search_query(False, True, False).compile(dialect=dialect))
+        index = next(ix for ix in Analysis.__table__.indexes if ix.name == "ix_analyses_sentiment_created")
+        index_ddl = str(CreateIndex(index).compile(dialect=dialect))
+        
+        assert "(analyses.analysis_metadata ->> 'sentiment') = $1" in query
+        assert "(analysis_metadata ->> 'sentiment')" in index_ddl
 
+
+
+class TestEstimatedTotal:
+    """Test cases for the planner-estimated search total."""
+    
+    @pytest.mark.asyncio
+    async def test_uses_planner_estimate(self):
+        """Test that a valid estimate is returned without counting rows."""
+        db = AsyncMock(spec=AsyncSession)
+        db.execute.return_value = MagicMock(scalar=MagicMock(return_value=1500))
+        
+        assert await _estimated_total(db) == 1500
+        assert db.execute.await_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_falls_back_to_exact_count(self):
+        """Test that an unanalyzed table (-1 estimate) falls back to count(*)."""
+        db = AsyncMock(spec=AsyncSession)
+        db.execute.side_effect = [
+            MagicMock(scalar=MagicMock(return_value=-1)),
+            MagicMock(scalar=MagicMock(return_value=42)),
+        ]
+        
+        assert await _estimated_total(db) == 42
+        assert db.execute.await_count == 2
@@ -0,0 +1,112 @@
+import json
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.core import cache
+from app.core.cache import get_cached_analysis, cache_analysis
+
+
+class TestSemanticCache:
+    """Test cases for the semantic cache helpers."""
+
+    @pytest.fixture
+    def mock_cache(self):
+        """Create a mock SemanticCache."""
+        mock_cache = AsyncMock()
+        with patch('app.core.cache._get_semantic_cache', return_value=mock_cache):
+            yield mock_cache
+
+    @pytest.mark.asyncio
+    async def test_lookup_disabled_returns_none(self):
+        """Test that lookups are skipped when the cache is unavailable."""
+        with patch('app.core.cache._get_semantic_cache', return_value=None):
+            assert await get_cached_analysis("Some text") is None
+
+    @pytest.mark.asyncio
+    async def test_lookup_hit_decodes_response(self, mock_cache):
+        """Test that a cache hit returns the stored analysis."""
+        cached = {"summary": "Cached summary", "metadata": {"title": "Cached"}}
+        mock_cache.acheck.return_value = [{"response": json.dumps(cached)}]
+
+        result = await get_cached_analysis("Some text")
+
+        assert result == cached
+        mock_cache.acheck.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_lookup_miss_returns_none(self, mock_cache):
+        """Test that a cache miss returns None."""
+        mock_cache.acheck.return_value = []
+
+        assert await get_cached_analysis("Some text") is None
+
+    @pytest.mark.asyncio
+    async def test_lookup_error_returns_none(self, mock_cache):
+        """Test that cache errors fall through to the LLM."""
+        mock_cache.acheck.side_effect = Exception("Redis down")
+
+        assert await get_cached_analysis("Some text") is None
+
+    @pytest.mark.asyncio
+    async def test_store_tags_model(self, mock_cache):
+        """Test that stored entries are tagged with the current model."""
+        analysis = {"summary": "Summary", "metadata": {"title": "Title"}}
+
+        with patch('app.core.cache.get_settings') as mock_get_settings:
+            mock_get_settings.return_value.OPENAI_MODEL = "gpt-3.5-turbo"
+            await cache_analysis("Some text", analysis)
+
+        kwargs = mock_cache.astore.call_args.kwargs
+        assert json.loads(kwargs["response"]) == analysis
+        assert kwargs["filters"] == {"model": "gpt-3.5-turbo"}
+
+    @pytest.mark.asyncio
+    async def test_store_error_is_swallowed(self, mock_cache):
+        """Test that cache store errors do not fail the request."""
+        mock_cache.astore.side_effect = Exception("Redis down")
+
+        await cache_analysis("Some text", {"summary": "Summary", "metadata": {}})
+
+    @pytest.fixture
+    def fresh_cache_state(self, monkeypatch):
+        """Reset the lazily built semantic cache and its retry state."""
+        monkeypatch.setattr(cache, "_semantic_cache", None)
+        monkeypatch.setattr(cache, "_semantic_cache_disabled", False)
+        monkeypatch.setattr(cache, "_semantic_cache_retry_at", 0.0)
+        monkeypatch.setattr(cache, "_semantic_cache_backoff", cache._SEMANTIC_CACHE_RETRY_MIN_SECONDS)
+
+        with patch('app.core.cache.get_settings') as mock_get_settings:
+            mock_settings = mock_get_settings.return_value
+            mock_settings.REDIS_URL = "redis://localhost:6379"
+            mock_settings.OPENAI_API_KEY = "test_key"
+            yield mock_settings
+
+    @pytest.mark.asyncio
+    async def test_vectorizer_uses_configured_dtype(self, fresh_cache_state):
+        """Test that the semantic cache stores embeddings at the configured precision."""
+        fresh_cache_state.SEMANTIC_CACHE_VECTOR_DTYPE = "float16"
+
+        with patch('app.core.cache.OpenAITextVectorizer') as mock_vectorizer, \
+                patch('app.core.cache.SemanticCache') as mock_semantic_cache:
+            assert await cache._get_semantic_cache() is mock_semantic_cache.return_value
+
+        assert mock_vectorizer.call_args.kwargs["dtype"] == "float16"
+        assert mock_semantic_cache.call_args.kwargs["vectorizer"] is mock_vectorizer.return_value
+
+    @pytest.mark.asyncio
+    async def test_failed_init_retried_after_backoff(self, fresh_cache_state, monkeypatch):
+        """Test that a failed init (e.g. Redis down) backs off and is retried rather than disabling the cache."""
+        now = 1000.0
+        monkeypatch.setattr(cache.time, "monotonic", lambda: now)
+
+        with patch('app.core.cache.OpenAITextVectorizer'), \
+                patch('app.core.cache.SemanticCache') as mock_semantic_cache:
+            mock_semantic_cache.side_effect = [Exception("Redis down"), mock_semantic_cache.return_value]
+
+            assert await cache._get_semantic_cache() is None
+            # Within the backoff window no new attempt is made
+            assert await cache._get_semantic_cache() is None
+            assert mock_semantic_cache.call_count == 1
+
+            now += cache._SEMANTIC_CACHE_RETRY_MIN_SECONDS
+            assert await cache._get_semantic_cache() is mock_semantic_cache.return_value
+            assert mock_semantic_cache.call_count == 2
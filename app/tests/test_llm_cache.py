@@ -0,0 +1,131 @@
+import json
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock, MagicMock
+from app.services.llm_cache import LLMCache, MemoryBackend, RedisBackend, create_llm_cache
+
+
+class TestMemoryBackend:
+    """Test cases for the in-process cache backend."""
+    
+    @pytest.mark.asyncio
+    async def test_set_and_get(self):
+        """Test that stored values are returned."""
+        backend = MemoryBackend()
+        await backend.set("key", "value", ttl_seconds=60)
+        
+        assert await backend.get("key") == "value"
+        assert await backend.get("missing") is None
+    
+    @pytest.mark.asyncio
+    async def test_expired_entry_is_a_miss(self):
+        """Test that entries past their TTL are dropped."""
+        backend = MemoryBackend()
+        await backend.set("key", "value", ttl_seconds=-1)
+        
+        assert await backend.get("key") is None
+    
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used(self):
+        """Test that the oldest unused entry is evicted when full."""
+        backend = MemoryBackend(max_entries=2)
+        await backend.set("a", "1", ttl_seconds=60)
+        await backend.set("b", "2", ttl_seconds=60)
+        await backend.get("a")
+        await backend.set("c", "3", ttl_seconds=60)
+        
+        assert await backend.get("a") == "1"
+        assert await backend.get("b") is None
+        assert await backend.get("c") == "3"
+
+
+class TestLLMCache:
+    """Test cases for LLMCache."""
+    
+    def test_make_key_is_order_independent(self):
+        """Test that keys depend on request values, not argument order."""
+        cache = LLMCache(MemoryBackend())
+        
+        assert cache.make_key(model="m", temperature=0.1) == cache.make_key(temperature=0.1, model="m")
+        assert cache.make_key(model="m", temperature=0.1) != cache.make_key(model="m", temperature=0.2)
+    
+    @pytest.mark.asyncio
+    async def test_backend_errors_are_misses(self):
+        """Test that backend failures do not propagate."""
+        backend = AsyncMock()
+        backend.get.side_effect = Exception("Redis down")
+        backend.set.side_effect = Exception("Redis down")
+        cache = LLMCache(backend)
+        
+        assert await cache.get("key") is None
+        await cache.set("key", "value")
+    
+    def test_create_llm_cache_backends(self):
+        """Test backend selection from settings."""
+        settings = MagicMock(LLM_CACHE_TTL_SECONDS=60, LLM_CACHE_MAX_ENTRIES=10, REDIS_URL=None)
+        assert isinstance(create_llm_cache(settings).backend, MemoryBackend)
+        
+        settings.REDIS_URL = "redis://localhost:6379"
+        assert isinstance(create_llm_cache(settings).backend, RedisBackend)
+        
+        settings.LLM_CACHE_TTL_SECONDS = 0
+        assert create_llm_cache(settings) is None
+
+
+class TestLLMServiceCaching:
+    """Test cases for completion caching in LLMService."""
+    
+    @pytest_asyncio.fixture
+    async def llm_service(self, llm_service_factory, openai_api):
+        """Create an LLMService against the fake OpenAI API with an in-memory cache."""
+        service = llm_service_factory(cache=LLMCache(MemoryBackend()))
+        yield service
+        await service.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_repeated_summary_served_from_cache(self, llm_service, openai_api):
+        """Test that an identical low-temperature request calls the API once."""
+        text = "Sample text for summary generation."
+        
+        summary1 = await llm_service.generate_summary(text)
+        summary2 = await llm_service.generate_summary(text)
+        
+        assert summary1 == summary2 == "Test response"
+        assert len(openai_api.requests) == 1
+    
+    @pytest.mark.asyncio
+    async def test_high_temperature_not_cached(self, llm_service, openai_api):
+        """Test that sampling-heavy requests always reach the API."""
+        messages = [{"role": "user", "content": "Hello"}]
+        
+        await llm_service._chat_completion(model="gpt-3.5-turbo", messages=messages, temperature=0.9)
+        await llm_service._chat_completion(model="gpt-3.5-turbo", messages=messages, temperature=0.9)
+        
+        assert len(openai_api.requests) == 2
+    
+    @pytest.mark.asyncio
+    async def test_valid_metadata_served_from_cache(self, llm_service, openai_api):
+        """Test that a metadata reply that validates is cached."""
+        openai_api.content = json.dumps({
+            "title": "Test Title", "topics": ["a", "b", "c"], "sentiment": "positive"
+        })
+        text = "Sample text for metadata extraction."
+        
+        metadata1 = await llm_service.extract_metadata(text)
+        metadata2 = await llm_service.extract_metadata(text)
+        
+        assert metadata1 == metadata2
+        assert metadata1["title"] == "Test Title"
+        assert len(openai_api.requests) == 1
+    
+    @pytest.mark.asyncio
+    async def test_unparseable_metadata_not_cached(self, llm_service, openai_api):
+        """Test that a reply that fails to parse is not replayed from the cache."""
+        openai_api.content = "Invalid JSON response"
+        text = "Sample text for metadata extraction."
+        
+        metadata = await llm_service.extract_metadata(text)
+        assert metadata["title"] == "Analysis Failed - Manual Review Required"
+        
+        await llm_service.extract_metadata(text)
+        assert len(openai_api.requests) == 2
@@ -5,27 +5,47 @@ Run this script before running tests or using the NLP utilities.
 
 import nltk
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from nltk.downloader import Downloader
+
+# Resource path probed with nltk.data.find for each required package
+_RESOURCE_MAP = {
+    'averaged_perceptron_tagger_eng': 'taggers/averaged_perceptron_tagger_eng/',
+    'stopwords': 'corpora/stopwords',
+    'wordnet': 'corpora/wordnet'
+}
+
+def ensure_package(package, resource):
+    """Download one NLTK package unless it is already installed; return whether it is available."""
+    try:
+        nltk.data.find(resource)
+        print(f"✓ {package} already present")
+        return True
+    except LookupError:
+        pass
+
+    try:
+        print(f"Downloading {package}...")
+        # A Downloader per call, since the shared nltk.download instance caches its index unguarded
+        if not Downloader().download(package, quiet=True):
+            raise RuntimeError("download reported failure")
+        print(f"✓ {package} downloaded successfully")
+        return True
+    except Exception as e:
+        print(f"✗ Failed to download {package}: {e}")
+        return False
 
 def download_nltk_data():
-    """Download required NLTK data packages."""
+    """Download required NLTK data packages that are not already installed, in parallel."""
     print("Downloading required NLTK data...")
-    
-    required_packages = [
-        'punkt',
-        'averaged_perceptron_tagger', 
-        'stopwords',
-        'wordnet'
-    ]
-    
-    for package in required_packages:
-        try:
-            print(f"Downloading {package}...")
-            nltk.download(package, quiet=True)
-            print(f"✓ {package} downloaded successfully")
-        except Exception as e:
-            print(f"✗ Failed to download {package}: {e}")
-            return False
-    
+
+    # Downloads are network-bound, so threads overlap them despite the GIL
+    with ThreadPoolExecutor(max_workers=len(_RESOURCE_MAP)) as executor:
+        results = list(executor.map(ensure_package, _RESOURCE_MAP.keys(), _RESOURCE_MAP.values()))
+
+    if not all(results):
+        return False
+
     print("\nAll NLTK data downloaded successfully!")
     return True
 
@@ -13,6 +13,12 @@ import asyncio
 from pathlib import Path
 from app.core import get_settings, get_logger, init_db, close_db, setup_logging
 
+try:
+    # Installed with uvicorn[standard]; faster loop setup and teardown
+    import uvloop
+except ImportError:
+    uvloop = None
+
 settings = get_settings()
 setup_logging(settings)
 logger = get_logger(__name__)
@@ -40,4 +46,6 @@ async def main():
 
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(main())